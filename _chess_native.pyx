@@ -0,0 +1,105 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+"""
+CHESS native shadow scan
+
+Optional Cython version of chess.scan_checkerboard_shadow_pixels. chess.py
+uses it automatically when it has been built. Build it in place with:
+
+    pip install cython
+    cythonize -i -3 _chess_native.pyx
+
+Rebuild it whenever this file changes. When the scan changes, bump
+SCAN_VERSION here and chess.NATIVE_SCAN_VERSION together, so chess.py
+ignores builds of the older version.
+
+License: CC0 (Public Domain)
+"""
+
+from libc.stdint cimport uint8_t
+
+
+# Must match chess.NATIVE_SCAN_VERSION
+SCAN_VERSION = 1
+
+# Must match chess.ALPHA_LIMIT
+cdef enum:
+    ALPHA_LIMIT = 128
+
+
+def scan_checkerboard_shadow_pixels(uint8_t[:, ::1] alpha, uint8_t[:, ::1] shadow_mask):
+    """
+    Find checkerboard shadow pixels with the original sequential scan.
+
+    Same algorithm and arguments as chess.scan_checkerboard_shadow_pixels,
+    except that shadow_mask must be a uint8 array (e.g. a bool array viewed
+    as uint8). Runs without the GIL. The scan stays serial because every
+    pixel depends on the shadows found before it.
+
+    Args:
+        alpha: contiguous 2D uint8 array of alpha values padded with a border
+               of zeros (will be modified)
+        shadow_mask: contiguous 2D uint8 array of the unpadded image size to
+                     mark shadow pixels in
+    """
+    cdef Py_ssize_t height = shadow_mask.shape[0]
+    cdef Py_ssize_t width = shadow_mask.shape[1]
+    cdef Py_ssize_t x, y
+    cdef uint8_t *row_up
+    cdef uint8_t *row
+    cdef uint8_t *row_down
+    cdef bint top_alpha, left_alpha, bottom_alpha, right_alpha
+    cdef bint top_left_solid, top_right_solid, bottom_left_solid, bottom_right_solid
+    cdef bint is_shadow
+    cdef int adjacent_alpha_count
+
+    if height == 0 or width == 0:
+        return
+
+    with nogil:
+        for y in range(1, height + 1):
+            # Bind the rows once so each pixel test is a 1D lookup
+            row_up = &alpha[y - 1, 0]
+            row = &alpha[y, 0]
+            row_down = &alpha[y + 1, 0]
+
+            for x in range(1, width + 1):
+                # Must be a solid pixel
+                if row[x] != 255:
+                    continue
+
+                # Check adjacent pixels
+                top_alpha = row_up[x] < ALPHA_LIMIT
+                left_alpha = row[x - 1] < ALPHA_LIMIT
+                bottom_alpha = row_down[x] < ALPHA_LIMIT
+                right_alpha = row[x + 1] < ALPHA_LIMIT
+
+                adjacent_alpha_count = top_alpha + left_alpha + bottom_alpha + right_alpha
+
+                is_shadow = adjacent_alpha_count == 4
+                if adjacent_alpha_count == 3:
+                    # Check diagonal pixels to avoid false positives at sprite edges
+                    top_left_solid = row_up[x - 1] == 255
+                    top_right_solid = row_up[x + 1] == 255
+                    bottom_left_solid = row_down[x - 1] == 255
+                    bottom_right_solid = row_down[x + 1] == 255
+
+                    is_shadow = (
+                        (top_alpha and top_left_solid and top_right_solid)
+                        or (left_alpha and top_left_solid and bottom_left_solid)
+                        or (right_alpha and top_right_solid and bottom_right_solid)
+                        or (bottom_alpha and bottom_left_solid and bottom_right_solid)
+                    )
+
+                if is_shadow:
+                    shadow_mask[y - 1, x - 1] = 1
+                    row[x] = ALPHA_LIMIT
+
+                    # Fade adjacent transparent pixels
+                    if top_alpha:
+                        row_up[x] += 32
+                    if left_alpha:
+                        row[x - 1] += 32
+                    if bottom_alpha:
+                        row_down[x] += 32
+                    if right_alpha:
+                        row[x + 1] += 32
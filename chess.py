@@ -13,16 +13,94 @@ Author: Claude (Anthropic)
 License: CC0 (Public Domain)
 """
 
+import os
 import sys
 import argparse
+import warnings
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
 import numpy as np
 from pathlib import Path
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import _chess_native
+except ImportError:
+    _chess_native = None
+
 
 # Alpha threshold - pixels with alpha < this are considered transparent
 ALPHA_LIMIT = 128
 
+# zlib level for saved PNGs - 1 is much faster than Pillow's default of 6 and
+# barely larger on small sprites; use 6-9 for final masters
+PNG_COMPRESS_LEVEL = 1
+
+# Target size of a row band for NumPy shadow detection (bytes of RGBA pixels),
+# so the planes of a band stay cache-resident across the detection passes
+TILE_BYTES = 256 * 1024
+
+# Most bands settle in a few NumPy passes, but a chain of shadows that depend
+# on each other settles one link per pass; past this many passes a band is
+# finished with the sequential scan instead
+MAX_BAND_PASSES = 32
+
+# Version of _chess_native.pyx this module expects; a build of any other
+# version is ignored, so a stale build never replaces the current scan
+NATIVE_SCAN_VERSION = 1
+
+if _chess_native is not None and getattr(_chess_native, 'SCAN_VERSION', None) != NATIVE_SCAN_VERSION:
+    warnings.warn("Ignoring out-of-date _chess_native build, rebuild it with "
+                  "'cythonize -i -3 _chess_native.pyx'")
+    _chess_native = None
+
+
+def make_color_transparent(pixel_array, color_hex=0xffffff, tolerance=0):
+    """
+    Set alpha to 0 for every pixel of a specific color, in place.
+    
+    Args:
+        pixel_array: numpy array of RGBA pixels (will be modified)
+        color_hex: Color to make transparent as hex (e.g., 0xffffff for white, 0x000000 for black)
+        tolerance: Color matching tolerance (0-255), allows for slight color variations
+    """
+    if tolerance == 0 and pixel_array.flags.c_contiguous:
+        # Exact match (fastest): view each RGBA pixel as one little-endian
+        # 32-bit word (red in the low byte, alpha in the high byte), so
+        # matching the color is one compare and clearing alpha one AND
+        pixels = pixel_array.view('<u4')[:, :, 0]
+        target = ((color_hex >> 16) & 0xFF) | (color_hex & 0xFF00) | ((color_hex & 0xFF) << 16)
+        pixels[(pixels & 0x00FFFFFF) == target] &= 0x00FFFFFF
+        return
+    
+    # Extract target RGB values from hex
+    target_rgb = np.array([(color_hex >> 16) & 0xFF,
+                           (color_hex >> 8) & 0xFF,
+                           color_hex & 0xFF], dtype=np.uint8)
+    rgb = pixel_array[:, :, :3]
+    
+    # Find pixels matching the target color (within tolerance), comparing all
+    # three channels in one broadcast operation
+    if tolerance == 0:
+        # Exact match
+        mask = np.all(rgb == target_rgb, axis=2)
+    else:
+        # Match with tolerance
+        difference = np.abs(rgb.astype(np.int16) - target_rgb)
+        mask = np.all(difference <= tolerance, axis=2)
+    
+    # Set alpha to 0 for matching pixels
+    pixel_array[mask, 3] = 0
+
 
 def convert_color_to_transparent(image, color_hex=0xffffff, tolerance=0):
     """
@@ -46,138 +124,400 @@ def convert_color_to_transparent(image, color_hex=0xffffff, tolerance=0):
     
     # Convert to numpy array
     pixel_array = np.array(image, dtype=np.uint8)
-    height, width = pixel_array.shape[:2]
-    
-    # Extract target RGB values from hex
-    target_r = (color_hex >> 16) & 0xFF
-    target_g = (color_hex >> 8) & 0xFF
-    target_b = color_hex & 0xFF
-    
-    # Find pixels matching the target color (within tolerance)
-    if tolerance == 0:
-        # Exact match (faster)
-        mask = (pixel_array[:, :, 0] == target_r) & \
-               (pixel_array[:, :, 1] == target_g) & \
-               (pixel_array[:, :, 2] == target_b)
-    else:
-        # Match with tolerance
-        r_match = np.abs(pixel_array[:, :, 0].astype(int) - target_r) <= tolerance
-        g_match = np.abs(pixel_array[:, :, 1].astype(int) - target_g) <= tolerance
-        b_match = np.abs(pixel_array[:, :, 2].astype(int) - target_b) <= tolerance
-        mask = r_match & g_match & b_match
-    
-    # Set alpha to 0 for matching pixels
-    pixel_array[mask, 3] = 0
+    make_color_transparent(pixel_array, color_hex, tolerance)
     
     # Convert back to PIL Image
     return Image.fromarray(pixel_array, 'RGBA')
 
 
-def is_checkerboard_alpha_shadow_pixel(pixel_array, x, y, width, height):
+def roll_neighbor(plane, dy, dx, fill, out=None):
     """
-    Check if a pixel at (x, y) should be considered a transparent shadow pixel.
+    Line up every pixel of a 2D plane with its neighbor at (x + dx, y + dy).
+    
+    This is np.roll(plane, (-dy, -dx), axis=(0, 1)) with the wrapped-around
+    row and column set to `fill`, since neighbors outside the image must not
+    come from the opposite edge. Unlike np.roll it can write into a
+    preallocated array.
     
     Args:
-        pixel_array: numpy array of RGBA pixels
-        x, y: coordinates to check
-        width, height: image dimensions
+        plane: 2D numpy array
+        dy, dx: offset of the neighbor to look at (-1, 0 or 1)
+        fill: value used for neighbors that fall outside the image
+        out: array of the same shape and dtype to write into (optional)
         
     Returns:
-        True if the pixel is transparent or on the edge, False otherwise
+        Array of the same shape where each element holds the neighbor's value
     """
-    if x < 0 or x >= width or y < 0 or y >= height:
-        return True
-    return pixel_array[y, x, 3] < ALPHA_LIMIT
+    if out is None:
+        out = np.empty_like(plane)
+    height, width = plane.shape
+    out[max(-dy, 0):height - max(dy, 0), max(-dx, 0):width - max(dx, 0)] = \
+        plane[max(dy, 0):height - max(-dy, 0), max(dx, 0):width - max(-dx, 0)]
+    if dy:
+        out[height - 1 if dy > 0 else 0, :] = fill
+    if dx:
+        out[:, width - 1 if dx > 0 else 0] = fill
+    return out
 
 
-def is_checkerboard_solid_shadow_pixel(pixel_array, x, y, width, height):
+def scan_checkerboard_shadow_pixels(alpha, shadow_mask):
     """
-    Determine if a pixel is part of a checkerboard shadow pattern.
+    Find checkerboard shadow pixels with the original sequential scan.
+    
+    Only the alpha channel is tracked: shadow pixels become semi-transparent
+    and each one fades its transparent neighbors by 32 alpha as the scan goes,
+    exactly as the full algorithm does. Replaced by the native Cython build
+    (_chess_native) when it is available, or compiled with Numba otherwise.
+    Without either it runs interpreted, and only for the bands that the NumPy
+    passes in find_checkerboard_shadow_band cannot settle quickly.
+    
+    The alpha plane carries a 1-pixel border of alpha 0, which is both
+    transparent (for the adjacent checks) and not solid (for the corner
+    checks), so the image edge needs no bounds checks. Border pixels can only
+    be faded from one side, so they stay transparent.
+    
+    Args:
+        alpha: contiguous 2D numpy array of alpha values padded with a border
+               of zeros (will be modified)
+        shadow_mask: Boolean or uint8 numpy array of the unpadded image size
+                     to mark shadow pixels in
+    """
+    height, width = shadow_mask.shape
+    for y in range(1, height + 1):
+        # Bind the rows once so each pixel test is a 1D lookup
+        row_up = alpha[y - 1]
+        row = alpha[y]
+        row_down = alpha[y + 1]
+        shadow_row = shadow_mask[y - 1]
+        
+        for x in range(1, width + 1):
+            # Must be a solid pixel
+            if row[x] != 255:
+                continue
+            
+            # Check adjacent pixels
+            top_alpha = row_up[x] < ALPHA_LIMIT
+            left_alpha = row[x - 1] < ALPHA_LIMIT
+            bottom_alpha = row_down[x] < ALPHA_LIMIT
+            right_alpha = row[x + 1] < ALPHA_LIMIT
+            
+            adjacent_alpha_count = (int(top_alpha) + int(left_alpha)
+                                    + int(bottom_alpha) + int(right_alpha))
+            
+            is_shadow = adjacent_alpha_count == 4
+            if adjacent_alpha_count == 3:
+                # Check diagonal pixels to avoid false positives at sprite edges
+                top_left_alpha = row_up[x - 1] != 255
+                top_right_alpha = row_up[x + 1] != 255
+                bottom_left_alpha = row_down[x - 1] != 255
+                bottom_right_alpha = row_down[x + 1] != 255
+                
+                is_shadow = (
+                    (top_alpha and not top_left_alpha and not top_right_alpha)
+                    or (left_alpha and not top_left_alpha and not bottom_left_alpha)
+                    or (right_alpha and not top_right_alpha and not bottom_right_alpha)
+                    or (bottom_alpha and not bottom_left_alpha and not bottom_right_alpha)
+                )
+            
+            if is_shadow:
+                shadow_row[x - 1] = True
+                row[x] = ALPHA_LIMIT
+                
+                # Fade adjacent transparent pixels
+                if top_alpha:
+                    row_up[x] += 32
+                if left_alpha:
+                    row[x - 1] += 32
+                if bottom_alpha:
+                    row_down[x] += 32
+                if right_alpha:
+                    row[x + 1] += 32
+
+
+if _chess_native is not None:
+    scan_checkerboard_shadow_pixels = _chess_native.scan_checkerboard_shadow_pixels
+elif numba is not None:
+    scan_checkerboard_shadow_pixels = numba.njit(cache=True, boundscheck=False)(
+        scan_checkerboard_shadow_pixels)
+
+# Whether the scan above runs as native code rather than in the interpreter;
+# if not, shadow detection uses the NumPy passes and only falls back to it
+SCAN_IS_COMPILED = _chess_native is not None or numba is not None
+
+
+def scan_checkerboard_shadow_band(alpha, shadow, first, last):
+    """
+    Find the checkerboard shadow pixels in a band of rows with the sequential scan.
+    
+    The shadows already found in the rows above the band are replayed first,
+    so the scan starts from the same alpha values the full scan reaches the
+    band with. Takes the same arguments as find_checkerboard_shadow_band.
+    
+    Args:
+        alpha: contiguous 2D uint8 array of alpha values for the band, with up
+               to two rows above it and one row below it
+        shadow: 2D uint8 array of the same shape to mark shadow pixels in
+        first: index of the first row of the band
+        last: index one past the last row of the band
+    """
+    height, width = alpha.shape
+    alpha = alpha.copy()
+    
+    # Convert the shadows above the band and fade their transparent neighbors,
+    # in scan order, which settles the row above the band and its first row
+    for y, x in zip(*np.nonzero(shadow[:first])):
+        alpha[y, x] = ALPHA_LIMIT
+        for target_y, target_x in ((y - 1, x), (y, x - 1), (y + 1, x), (y, x + 1)):
+            if (0 <= target_y < height and 0 <= target_x < width
+                    and alpha[target_y, target_x] < ALPHA_LIMIT):
+                alpha[target_y, target_x] += 32
+    
+    # Keep the row above and below the band, padding with zeros at the image
+    # edges like the full scan does
+    padding = ((int(first == 0), int(last == height)), (1, 1))
+    shadow[first:last] = 0
+    scan_checkerboard_shadow_pixels(np.pad(alpha[max(first - 1, 0):last + 1], padding),
+                                    shadow[first:last])
+
+
+def find_checkerboard_shadow_band(alpha, shadow, first, last):
+    """
+    Find the checkerboard shadow pixels in a band of rows with NumPy.
+    
+    The band is re-evaluated against the previous estimate until its mask
+    stops changing, or finished with scan_checkerboard_shadow_band if that
+    takes more than MAX_BAND_PASSES passes. Rows before the band must already
+    hold their final shadows; rows after it are only read for their alpha.
+    
+    Args:
+        alpha: contiguous 2D uint8 array of alpha values for the band, with up
+               to two rows above it and one row below it
+        shadow: 2D uint8 array of the same shape to mark shadow pixels in
+        first: index of the first row of the band
+        last: index one past the last row of the band
+    """
+    solid_pixels = alpha == 255
+    solid = solid_pixels.view(np.uint8)
+    non_solid = solid ^ 1
+    
+    # Transparent 4-neighbors (a cross-shaped stencil); the edge counts as
+    # transparent. Pixels below have not been scanned yet, so bottom_alpha is
+    # final, and the others are final too unless fades can change them.
+    transparent = (alpha < ALPHA_LIMIT).view(np.uint8)
+    top_alpha = roll_neighbor(transparent, -1, 0, 1)
+    left_alpha = roll_neighbor(transparent, 0, -1, 1)
+    bottom_alpha = roll_neighbor(transparent, 1, 0, 1)
+    right_alpha = roll_neighbor(transparent, 0, 1, 1)
+    adjacent_alpha_count = top_alpha + left_alpha + bottom_alpha + right_alpha
+    
+    # Shadow pixels need at least 3 transparent neighbors, and fades only ever
+    # make pixels less transparent, so solid pixels with fewer can never be
+    # shadows. Skip the passes below when that rules out every pixel.
+    if not np.any(solid_pixels[first:last] & (adjacent_alpha_count[first:last] >= 3)):
+        return
+    
+    # Up to three shadows (96 alpha) can fade a neighbor before the scan
+    # reaches it, so only pixels starting at 32-127 alpha can be pushed past
+    # ALPHA_LIMIT. Without any, the adjacent checks never change between passes.
+    fade_sensitive = np.any((alpha >= ALPHA_LIMIT - 96) & (alpha < ALPHA_LIMIT))
+    
+    # Pixels to the bottom corners have not been scanned yet
+    bottom_left_alpha = roll_neighbor(non_solid, 1, -1, 1)
+    bottom_right_alpha = roll_neighbor(non_solid, 1, 1, 1)
+    
+    # Work buffers, reused on every pass
+    faded = np.empty_like(solid)
+    faded_above = np.empty_like(solid)
+    faded_left = np.empty_like(solid)
+    faded_right = np.empty_like(solid)
+    limit = np.empty_like(solid)
+    fade_transparent = np.empty(solid.shape, dtype=bool)
+    scanned_non_solid = np.empty_like(solid)
+    top_left_alpha = np.empty_like(solid)
+    top_right_alpha = np.empty_like(solid)
+    
+    for _ in range(MAX_BAND_PASSES):
+        if fade_sensitive:
+            # Each shadow fades the pixels around it by 32 alpha, so a
+            # neighbor's alpha must start lower to still be transparent when
+            # the scan reaches it, once for every shadow scanned before it
+            np.left_shift(shadow, 5, out=faded)
+            roll_neighbor(faded, -1, 0, 0, out=faded_above)
+            roll_neighbor(faded, 0, -1, 0, out=faded_left)
+            roll_neighbor(faded, 0, 1, 0, out=faded_right)
+            
+            np.subtract(ALPHA_LIMIT, faded_above, out=limit)
+            np.less(alpha, limit, out=fade_transparent)
+            roll_neighbor(fade_transparent.view(np.uint8), 0, 1, 1, out=right_alpha)
+            limit -= faded_left
+            np.less(alpha, limit, out=fade_transparent)
+            roll_neighbor(fade_transparent.view(np.uint8), 0, -1, 1, out=left_alpha)
+            limit -= faded_right
+            np.less(alpha, limit, out=fade_transparent)
+            roll_neighbor(fade_transparent.view(np.uint8), -1, 0, 1, out=top_alpha)
+            
+            np.add(top_alpha, left_alpha, out=adjacent_alpha_count)
+            adjacent_alpha_count += bottom_alpha
+            adjacent_alpha_count += right_alpha
+        
+        # Shadows already found above have been made semi-transparent
+        np.bitwise_or(non_solid, shadow, out=scanned_non_solid)
+        roll_neighbor(scanned_non_solid, -1, -1, 1, out=top_left_alpha)
+        roll_neighbor(scanned_non_solid, -1, 1, 1, out=top_right_alpha)
+        
+        # With 3 transparent neighbors, check the diagonal pixels to avoid false
+        # positives at sprite edges: if an adjacent pixel is transparent AND both
+        # corners on that side are solid, this is a shadow meeting a sprite edge
+        edge_shadow = (
+            (top_alpha & ~top_left_alpha & ~top_right_alpha)
+            | (left_alpha & ~top_left_alpha & ~bottom_left_alpha)
+            | (right_alpha & ~top_right_alpha & ~bottom_right_alpha)
+            | (bottom_alpha & ~bottom_left_alpha & ~bottom_right_alpha)
+        )
+        
+        # A count of 4 is the only one with bit 2 set
+        new_shadow = solid & ((adjacent_alpha_count >> 2)
+                              | ((adjacent_alpha_count == 3).view(np.uint8) & edge_shadow))
+        # Only the band's own rows are updated; the rows around it are fixed
+        new_shadow = new_shadow[first:last]
+        if np.array_equal(new_shadow, shadow[first:last]):
+            return
+        shadow[first:last] = new_shadow
+    
+    scan_checkerboard_shadow_band(alpha, shadow, first, last)
+
+
+def find_checkerboard_shadow_pixels(pixel_array):
+    """
+    Find all checkerboard shadow pixels in an image.
     
     A pixel is considered a checkerboard shadow pixel if:
     1. It's fully opaque (alpha = 255)
     2. It's surrounded by transparent pixels (4 adjacent or 3 with corner checks)
     
+    The original per-pixel algorithm converts shadows and fades their neighbors
+    while it scans the image in raster order, so later pixels see an image that
+    earlier shadows have already modified: converted shadows no longer count as
+    solid corners, and faded pixels can climb past ALPHA_LIMIT. These effects
+    only ever flow from earlier pixels to later ones, so the image is
+    re-evaluated against the previous estimate, one band of rows at a time,
+    until the mask stops changing, which reproduces the scan exactly. When
+    the native extension is built or Numba is installed, the compiled
+    sequential scan is used instead.
+    
     Args:
         pixel_array: numpy array of RGBA pixels
-        x, y: coordinates to check
-        width, height: image dimensions
         
     Returns:
-        True if this is a checkerboard shadow pixel
+        Boolean numpy array, True for checkerboard shadow pixels
     """
-    # Must be a solid pixel
-    if pixel_array[y, x, 3] != 255:
-        return False
-    
-    # Check adjacent pixels
-    top_alpha = is_checkerboard_alpha_shadow_pixel(pixel_array, x, y - 1, width, height)
-    left_alpha = is_checkerboard_alpha_shadow_pixel(pixel_array, x - 1, y, width, height)
-    bottom_alpha = is_checkerboard_alpha_shadow_pixel(pixel_array, x, y + 1, width, height)
-    right_alpha = is_checkerboard_alpha_shadow_pixel(pixel_array, x + 1, y, width, height)
-    
-    adjacent_alpha_count = sum([top_alpha, left_alpha, bottom_alpha, right_alpha])
-    
-    if adjacent_alpha_count == 4:
-        # Surrounded by alpha pixels - definitely a shadow pixel
-        return True
-    elif adjacent_alpha_count == 3:
-        # Need to check diagonal pixels to avoid false positives at sprite edges
-        # When a shadow meets a sprite edge, we want shadow pixels but not sprite pixels
-        
-        def check_corner_alpha(cx, cy):
-            """Check if corner pixel is transparent"""
-            if cx < 0 or cx >= width or cy < 0 or cy >= height:
-                return True
-            return pixel_array[cy, cx, 3] != 255
-        
-        top_left_alpha = check_corner_alpha(x - 1, y - 1)
-        top_right_alpha = check_corner_alpha(x + 1, y - 1)
-        bottom_left_alpha = check_corner_alpha(x - 1, y + 1)
-        bottom_right_alpha = check_corner_alpha(x + 1, y + 1)
-        
-        # Check each direction - if adjacent pixel is transparent AND 
-        # both corners on that side are solid, this is likely a sprite edge, not shadow
-        if top_alpha and not top_left_alpha and not top_right_alpha:
-            return True
-        elif left_alpha and not top_left_alpha and not bottom_left_alpha:
-            return True
-        elif right_alpha and not top_right_alpha and not bottom_right_alpha:
-            return True
-        elif bottom_alpha and not bottom_left_alpha and not bottom_right_alpha:
-            return True
-    
-    return False
+    # Copy the alpha channel into a dense plane (1 byte per pixel instead of a
+    # 4-byte RGBA stride) and work on 0/1 uint8 planes of it, so every test
+    # below is a byte-wide comparison or bitwise operation on contiguous memory
+    alpha = np.ascontiguousarray(pixel_array[:, :, 3])
+    solid_pixels = alpha == 255
+    
+    # Shadow pixels must be solid, so there is nothing to find without any
+    if not solid_pixels.any():
+        return solid_pixels
+    
+    if SCAN_IS_COMPILED:
+        # The compiled scan is exact in a single pass
+        shadow = np.zeros_like(solid_pixels)
+        scan_checkerboard_shadow_pixels(np.pad(alpha, 1), shadow.view(np.uint8))
+        return shadow
+    
+    # Work through the image in bands of rows, each fully solved before the
+    # next, so every pass over a band stays in cache instead of streaming the
+    # whole image. A row only depends on the shadows up to two rows above it
+    # (through the fades of its top neighbor) and on the alpha one row below,
+    # so each band brings that much of its surroundings along.
+    height, width = alpha.shape
+    shadow = np.zeros(alpha.shape, dtype=np.uint8)
+    band_rows = max(1, TILE_BYTES // (width * 4))
+    for band_start in range(0, height, band_rows):
+        band_stop = min(band_start + band_rows, height)
+        top = max(band_start - 2, 0)
+        bottom = min(band_stop + 1, height)
+        find_checkerboard_shadow_band(alpha[top:bottom], shadow[top:bottom],
+                                      band_start - top, band_stop - top)
+    return shadow.view(bool)
 
 
-def fade_checkerboard_alpha_pixel(pixel_array, x, y, source_pixel, width, height):
+def saturating_add(a, b):
     """
-    Fade a transparent pixel by adding color from adjacent shadow pixel.
+    Add two uint8 arrays, clamping at 255 instead of wrapping around.
+    
+    Replaced by a compiled Numba ufunc, or by OpenCV's SIMD add, when either
+    is available.
     
     Args:
-        pixel_array: numpy array of RGBA pixels (will be modified)
-        x, y: coordinates of pixel to fade
-        source_pixel: RGBA values of the shadow pixel to blend from
-        width, height: image dimensions
+        a, b: uint8 numpy arrays of the same shape
+        
+    Returns:
+        uint8 numpy array of the clamped sums
     """
-    if x < 0 or x >= width or y < 0 or y >= height:
-        return
+    total = a.astype(np.uint16)
+    total += b
+    np.minimum(total, 255, out=total)
+    return total.astype(np.uint8)
+
+
+def saturating_add_pixel(a, b):
+    """Scalar kernel of saturating_add, compiled into a ufunc by Numba"""
+    total = int(a) + int(b)
+    return 255 if total > 255 else total
+
+
+if numba is not None:
+    saturating_add = numba.vectorize(['uint8(uint8, uint8)'], cache=True)(saturating_add_pixel)
+elif cv2 is not None:
+    saturating_add = cv2.add
+
+
+def fade_checkerboard_shadow_pixels(pixel_array, shadow_mask):
+    """
+    Convert shadow pixels and fade the transparent pixels around them.
     
-    dest_pixel = pixel_array[y, x]
+    Shadow pixels are made semi-transparent and darkened. Each adjacent
+    transparent pixel then gets 1/4 of the shadow's color and 32 more alpha,
+    once per neighboring shadow, until it is no longer transparent. Fully
+    transparent pixels are set to black before their first fade.
     
-    # Only fade pixels that are currently transparent
-    if dest_pixel[3] < ALPHA_LIMIT:
+    Args:
+        pixel_array: numpy array of RGBA pixels (will be modified)
+        shadow_mask: Boolean numpy array of checkerboard shadow pixels
+    """
+    height, width = pixel_array.shape[:2]
+    shadow_y, shadow_x = np.nonzero(shadow_mask)
+    
+    # Make shadow pixels semi-transparent and darken them
+    pixel_array[shadow_y, shadow_x, :3] //= 2
+    pixel_array[shadow_y, shadow_x, 3] = ALPHA_LIMIT
+    fade_color = pixel_array[shadow_y, shadow_x, :3] >> 2
+    
+    # The scan reaches a pixel's shadows above, left, right, then below it, so
+    # fade the pixels below, right of, left of, then above every shadow. No
+    # pixel is faded twice within one direction.
+    for dy, dx in ((1, 0), (0, 1), (0, -1), (-1, 0)):
+        target_y = shadow_y + dy
+        target_x = shadow_x + dx
+        inside = (target_y >= 0) & (target_y < height) & (target_x >= 0) & (target_x < width)
+        target_y, target_x = target_y[inside], target_x[inside]
+        dest = pixel_array[target_y, target_x]
+        
+        # Only fade pixels that are currently transparent
+        faded = dest[:, 3] < ALPHA_LIMIT
+        target_y, target_x, dest = target_y[faded], target_x[faded], dest[faded]
+        if not len(dest):
+            continue
+        
         # If fully transparent, set to black first
-        if dest_pixel[3] == 0:
-            dest_pixel[0] = 0
-            dest_pixel[1] = 0
-            dest_pixel[2] = 0
+        dest[dest[:, 3] == 0, :3] = 0
         
-        # Add 1/4 of source color and increase alpha
-        dest_pixel[0] = min(255, dest_pixel[0] + source_pixel[0] // 4)
-        dest_pixel[1] = min(255, dest_pixel[1] + source_pixel[1] // 4)
-        dest_pixel[2] = min(255, dest_pixel[2] + source_pixel[2] // 4)
-        dest_pixel[3] = min(255, dest_pixel[3] + 32)
+        # Add 1/4 of source color (saturating) and increase alpha
+        pixel_array[target_y, target_x, :3] = saturating_add(dest[:, :3], fade_color[inside][faded])
+        pixel_array[target_y, target_x, 3] = dest[:, 3] + 32
 
 
 def convert_checkerboard_to_alpha(image, transparency_color=0xffffff):
@@ -190,45 +530,39 @@ def convert_checkerboard_to_alpha(image, transparency_color=0xffffff):
                           (default: 0xffffff for white, use 0x000000 for black, None to skip)
         
     Returns:
-        PIL Image object with alpha shadows
+        PIL Image object with alpha shadows. The input image is never modified;
+        if it is already RGBA and has nothing to convert, it is returned as is
     """
+    # Ensure we have an RGBA image (no conversion if it already is one)
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    
+    # Read-only array of the pixels (PIL hands them over as a bytes copy); it
+    # is copied again into a writable array only if something is going to change
+    pixel_array = np.asarray(image)
+    
     # First, convert the transparency color to alpha if specified
     if transparency_color is not None:
-        image = convert_color_to_transparent(image, transparency_color)
-    else:
-        # Ensure we have an RGBA image
-        if image.mode != 'RGBA':
-            image = image.convert('RGBA')
+        pixel_array = pixel_array.copy()
+        make_color_transparent(pixel_array, transparency_color)
     
-    # Convert to numpy array for easier manipulation
-    pixel_array = np.array(image, dtype=np.uint8)
-    height, width = pixel_array.shape[:2]
+    # Find checkerboard shadow pixels
+    shadow_mask = find_checkerboard_shadow_pixels(pixel_array)
     
-    # Find and convert checkerboard shadow pixels
-    for y in range(height):
-        for x in range(width):
-            if is_checkerboard_solid_shadow_pixel(pixel_array, x, y, width, height):
-                # This is a shadow pixel - make it semi-transparent
-                # and darken it
-                pixel_array[y, x, 3] = ALPHA_LIMIT
-                pixel_array[y, x, 0] //= 2
-                pixel_array[y, x, 1] //= 2
-                pixel_array[y, x, 2] //= 2
-                
-                # Store original color for blending
-                source_pixel = pixel_array[y, x].copy()
-                
-                # Fade adjacent transparent pixels
-                fade_checkerboard_alpha_pixel(pixel_array, x, y - 1, source_pixel, width, height)
-                fade_checkerboard_alpha_pixel(pixel_array, x - 1, y, source_pixel, width, height)
-                fade_checkerboard_alpha_pixel(pixel_array, x, y + 1, source_pixel, width, height)
-                fade_checkerboard_alpha_pixel(pixel_array, x + 1, y, source_pixel, width, height)
+    if transparency_color is None:
+        if not shadow_mask.any():
+            return image
+        pixel_array = pixel_array.copy()
+    
+    # Convert checkerboard shadow pixels
+    fade_checkerboard_shadow_pixels(pixel_array, shadow_mask)
     
     # Convert back to PIL Image
     return Image.fromarray(pixel_array, 'RGBA')
 
 
-def convert_file(input_path, output_path=None, transparency_color=0xffffff):
+def convert_file(input_path, output_path=None, transparency_color=0xffffff,
+                 compress_level=PNG_COMPRESS_LEVEL):
     """
     Convert a BMP file with checkerboard shadows to PNG with alpha shadows.
     
@@ -237,6 +571,7 @@ def convert_file(input_path, output_path=None, transparency_color=0xffffff):
         output_path: Path to output PNG file (optional, defaults to same name with .png extension)
         transparency_color: Hex color to convert to transparent before processing
                           (default: 0xffffff for white, use 0x000000 for black, None to skip)
+        compress_level: PNG zlib compression level, 0-9 (default: 1 for fast saves)
         
     Returns:
         PIL Image object with converted shadows
@@ -259,13 +594,79 @@ def convert_file(input_path, output_path=None, transparency_color=0xffffff):
         output_path = Path(output_path)
     
     # Save as PNG
-    converted_image.save(output_path, 'PNG')
+    converted_image.save(output_path, 'PNG', compress_level=compress_level, optimize=False)
     
     print(f"Converted {input_path} -> {output_path}")
     
     return converted_image
 
 
+def convert_file_to_path(input_path, output_path, transparency_color, compress_level):
+    """Convert one file and return where it was saved (picklable batch worker)"""
+    convert_file(input_path, output_path, transparency_color, compress_level)
+    return Path(output_path) if output_path is not None else Path(input_path).with_suffix('.png')
+
+
+def convert_files(input_paths, output_dir=None, transparency_color=0xffffff, workers=None,
+                  compress_level=PNG_COMPRESS_LEVEL):
+    """
+    Convert several BMP files to PNG with alpha shadows in parallel.
+    
+    Each file is converted in its own worker process, so batches scale with
+    the number of CPU cores. Scripts must call this from under
+    `if __name__ == '__main__':`, since Windows and macOS start the workers
+    by re-importing the main script.
+    
+    Args:
+        input_paths: Iterable of paths to input BMP files
+        output_dir: Directory for the output PNG files (optional, defaults to
+                    saving each PNG next to its input file)
+        transparency_color: Hex color to convert to transparent before processing
+                          (default: 0xffffff for white, use 0x000000 for black, None to skip)
+        workers: Number of worker processes, at least 1 (default: number of CPUs)
+        compress_level: PNG zlib compression level, 0-9 (default: 1 for fast saves)
+        
+    Returns:
+        List of output PNG paths, in the same order as input_paths
+    """
+    # Check before creating the output directory
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    
+    input_paths = [Path(path) for path in input_paths]
+    
+    if output_dir is None:
+        output_paths = [path.with_suffix('.png') for path in input_paths]
+    else:
+        output_dir = Path(output_dir)
+        output_paths = [output_dir / path.with_suffix('.png').name for path in input_paths]
+    
+    # Two inputs saved to the same PNG (e.g. a.bmp and a.BMP) would be written
+    # by two workers at once, so refuse them before doing any work
+    saved_from = {}
+    for input_path, output_path in zip(input_paths, output_paths):
+        key = os.path.normcase(os.path.abspath(output_path))
+        if key in saved_from:
+            raise ValueError(f"{saved_from[key]} and {input_path} would both be saved as {output_path}")
+        saved_from[key] = input_path
+    
+    if output_dir is not None:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    
+    transparency_colors = [transparency_color] * len(input_paths)
+    compress_levels = [compress_level] * len(input_paths)
+    
+    if workers == 1 or len(input_paths) <= 1:
+        return list(map(convert_file_to_path, input_paths, output_paths, transparency_colors,
+                        compress_levels))
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(convert_file_to_path, input_paths, output_paths,
+                                 transparency_colors, compress_levels))
+
+
 def main():
     """Command-line interface"""
     parser = argparse.ArgumentParser(
@@ -273,14 +674,21 @@ def main():
         epilog='Converts BMP files with checkerboard shadows to PNG with alpha transparency.'
     )
     
-    parser.add_argument('input', help='Input BMP file path')
-    parser.add_argument('output', nargs='?', help='Output PNG file path (optional, defaults to input name with .png extension)')
+    parser.add_argument('input', help='Input BMP file path, or a directory to convert every BMP file in it')
+    parser.add_argument('output', nargs='?', help='Output PNG file path, or output directory for a directory input (optional, defaults to input name with .png extension)')
     parser.add_argument('-t', '--transparency-color', 
                         choices=['white', 'black', 'none'],
                         default='white',
                         help='Color to convert to transparent before processing (default: white)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of files to convert in parallel for a directory input (default: number of CPUs)')
+    parser.add_argument('-c', '--compress-level', type=int, choices=range(10),
+                        default=PNG_COMPRESS_LEVEL, metavar='{0-9}',
+                        help=f'PNG compression level, higher is smaller but slower (default: {PNG_COMPRESS_LEVEL})')
     
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be at least 1')
     
     # Convert transparency color argument to hex value
     transparency_map = {
@@ -291,7 +699,17 @@ def main():
     transparency_color = transparency_map[args.transparency_color]
     
     try:
-        convert_file(args.input, args.output, transparency_color)
+        input_path = Path(args.input)
+        if input_path.is_dir():
+            # Match the extension in any case (e.g. SPRITE.BMP), as Windows does
+            input_paths = sorted(path for path in input_path.iterdir()
+                                 if path.suffix.lower() == '.bmp' and path.is_file())
+            if not input_paths:
+                raise FileNotFoundError(f"No BMP files found in {input_path}")
+            convert_files(input_paths, args.output,
+                          transparency_color, args.jobs, args.compress_level)
+        else:
+            convert_file(input_path, args.output, transparency_color, args.compress_level)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
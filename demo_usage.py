@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 """
 Demo script for CHESS (Convert Half-tone Effects to Smooth Shadows)
-Shows how to use the checkerboard_to_alpha module.
+Shows how to use the chess module.
 """
 
 from PIL import Image
 import numpy as np
-from checkerboard_to_alpha import convert_checkerboard_to_alpha, convert_file
+from chess import convert_checkerboard_to_alpha, convert_file
 
 
 def create_test_checkerboard_bmp():
@@ -25,13 +25,13 @@ def create_test_checkerboard_bmp():
     # Fill with transparent background
     img_array[:, :, 3] = 0
     
+    # Pixel coordinates for whole-image masks (much faster than looping)
+    yy, xx = np.indices((height, width))
+    
     # Create a "sprite" - a red circle in the upper portion
     center_y, center_x = 30, 50
-    for y in range(height):
-        for x in range(width):
-            dist = np.sqrt((x - center_x)**2 + (y - center_y)**2)
-            if dist < 20:
-                img_array[y, x] = [200, 50, 50, 255]  # Red sprite
+    sprite = (xx - center_x)**2 + (yy - center_y)**2 < 20**2
+    img_array[sprite] = [200, 50, 50, 255]  # Red sprite
     
     # Create a checkerboard shadow pattern below the sprite
     # Shadows in Dink are black checkerboard patterns
@@ -40,13 +40,12 @@ def create_test_checkerboard_bmp():
     shadow_start_x = 30
     shadow_end_x = 70
     
-    for y in range(shadow_start_y, shadow_end_y):
-        for x in range(shadow_start_x, shadow_end_x):
-            # Checkerboard pattern: alternate pixels
-            if (x + y) % 2 == 0:
-                img_array[y, x] = [0, 0, 0, 255]  # Black solid pixel
-            else:
-                img_array[y, x] = [0, 0, 0, 0]  # Transparent pixel
+    # Checkerboard pattern: alternate pixels
+    checker = (xx + yy) % 2 == 0
+    shadow = img_array[shadow_start_y:shadow_end_y, shadow_start_x:shadow_end_x]
+    shadow_checker = checker[shadow_start_y:shadow_end_y, shadow_start_x:shadow_end_x]
+    shadow[shadow_checker] = [0, 0, 0, 255]  # Black solid pixel
+    shadow[~shadow_checker] = [0, 0, 0, 0]  # Transparent pixel
     
     # Create PIL Image
     img = Image.fromarray(img_array, 'RGBA')
@@ -98,12 +97,11 @@ def example_3_raw_image_data():
     img_array = np.zeros((height, width, 4), dtype=np.uint8)
     
     # Add a simple checkerboard shadow in the middle
-    for y in range(20, 40):
-        for x in range(15, 35):
-            if (x + y) % 2 == 0:
-                img_array[y, x] = [0, 0, 0, 255]  # Black solid
-            else:
-                img_array[y, x] = [0, 0, 0, 0]    # Transparent
+    yy, xx = np.indices((height, width))
+    checker = ((xx + yy) % 2 == 0)[20:40, 15:35]
+    shadow = img_array[20:40, 15:35]
+    shadow[checker] = [0, 0, 0, 255]  # Black solid
+    shadow[~checker] = [0, 0, 0, 0]    # Transparent
     
     original_image = Image.fromarray(img_array, 'RGBA')
     
@@ -142,17 +140,14 @@ def example_4_transparency_colors():
     img_array[:, :] = [255, 255, 255, 255]  # White background
     
     # Add sprite
-    for y in range(20, 30):
-        for x in range(25, 35):
-            img_array[y, x] = [200, 50, 50, 255]  # Red sprite
+    img_array[20:30, 25:35] = [200, 50, 50, 255]  # Red sprite
     
     # Add black checkerboard shadow
-    for y in range(35, 50):
-        for x in range(20, 40):
-            if (x + y) % 2 == 0:
-                img_array[y, x] = [0, 0, 0, 255]
-            else:
-                img_array[y, x] = [255, 255, 255, 255]
+    yy, xx = np.indices((height, width))
+    checker = ((xx + yy) % 2 == 0)[35:50, 20:40]
+    shadow = img_array[35:50, 20:40]
+    shadow[checker] = [0, 0, 0, 255]
+    shadow[~checker] = [255, 255, 255, 255]
     
     white_bg_img = Image.fromarray(img_array, 'RGBA')
     white_bg_img.save('demo_white_bg.bmp', 'BMP')
@@ -171,17 +166,11 @@ def example_4_transparency_colors():
     img_array[:, :] = [0, 0, 0, 255]  # Black background
     
     # Add sprite
-    for y in range(20, 30):
-        for x in range(25, 35):
-            img_array[y, x] = [50, 100, 200, 255]  # Blue sprite
+    img_array[20:30, 25:35] = [50, 100, 200, 255]  # Blue sprite
     
     # Add white checkerboard shadow
-    for y in range(35, 50):
-        for x in range(20, 40):
-            if (x + y) % 2 == 0:
-                img_array[y, x] = [255, 255, 255, 255]
-            else:
-                img_array[y, x] = [0, 0, 0, 255]
+    shadow[checker] = [255, 255, 255, 255]
+    shadow[~checker] = [0, 0, 0, 255]
     
     black_bg_img = Image.fromarray(img_array, 'RGBA')
     black_bg_img.save('demo_black_bg.bmp', 'BMP')
@@ -208,17 +197,14 @@ def example_5_batch_processing():
     print("\nExample code for batch processing:")
     print("""
 from pathlib import Path
-from checkerboard_to_alpha import convert_file
-
-# Process all BMP files in a directory
-input_dir = Path('input_sprites')
-output_dir = Path('output_sprites')
-output_dir.mkdir(exist_ok=True)
+from chess import convert_files
 
-for bmp_file in input_dir.glob('*.bmp'):
-    output_file = output_dir / bmp_file.with_suffix('.png').name
-    convert_file(bmp_file, output_file)
-    print(f"Converted {bmp_file.name}")
+# The guard is required: worker processes re-import the main script on
+# Windows and macOS
+if __name__ == '__main__':
+    # Process all BMP files in a directory, one worker process per CPU
+    bmp_files = Path('input_sprites').glob('*.bmp')
+    output_files = convert_files(bmp_files, 'output_sprites')
 """)
 
 
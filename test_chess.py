@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for CHESS
+
+Compares convert_checkerboard_to_alpha against a plain per-pixel version of
+the original algorithm, on every shadow detection path: the compiled scan
+(when Cython or Numba is available), the NumPy bands, and the sequential
+scan the bands fall back to.
+
+Run with:
+    python -m unittest test_chess
+
+License: CC0 (Public Domain)
+"""
+
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from PIL import Image
+
+import chess
+from chess import ALPHA_LIMIT, convert_checkerboard_to_alpha
+
+HERE = Path(__file__).parent
+
+
+def reference_convert(pixel_array):
+    """
+    Convert checkerboard shadows with the original per-pixel algorithm.
+
+    Args:
+        pixel_array: numpy array of RGBA pixels (will be modified)
+    """
+    height, width = pixel_array.shape[:2]
+
+    def inside(x, y):
+        return 0 <= x < width and 0 <= y < height
+
+    def transparent(x, y):
+        return not inside(x, y) or pixel_array[y, x, 3] < ALPHA_LIMIT
+
+    def solid(x, y):
+        return inside(x, y) and pixel_array[y, x, 3] == 255
+
+    for y in range(height):
+        for x in range(width):
+            if pixel_array[y, x, 3] != 255:
+                continue
+
+            top = transparent(x, y - 1)
+            left = transparent(x - 1, y)
+            bottom = transparent(x, y + 1)
+            right = transparent(x + 1, y)
+            count = sum([bool(top), bool(left), bool(bottom), bool(right)])
+
+            is_shadow = count == 4 or count == 3 and (
+                (top and solid(x - 1, y - 1) and solid(x + 1, y - 1))
+                or (left and solid(x - 1, y - 1) and solid(x - 1, y + 1))
+                or (right and solid(x + 1, y - 1) and solid(x + 1, y + 1))
+                or (bottom and solid(x - 1, y + 1) and solid(x + 1, y + 1))
+            )
+            if not is_shadow:
+                continue
+
+            pixel_array[y, x, :3] //= 2
+            pixel_array[y, x, 3] = ALPHA_LIMIT
+            fade_color = pixel_array[y, x, :3].astype(int) // 4
+
+            for target_x, target_y in ((x, y - 1), (x - 1, y), (x, y + 1), (x + 1, y)):
+                if not inside(target_x, target_y) or pixel_array[target_y, target_x, 3] >= ALPHA_LIMIT:
+                    continue
+                dest = pixel_array[target_y, target_x]
+                if dest[3] == 0:
+                    dest[:3] = 0
+                dest[:3] = np.minimum(255, dest[:3].astype(int) + fade_color)
+                dest[3] += 32
+
+
+def random_images(count=120, seed=0):
+    """Yield seeded random RGBA arrays with shadow-prone alpha planes"""
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        height, width = rng.integers(1, 24, 2)
+        kind = i % 4
+        if kind == 0:
+            alpha = rng.choice([0, 255], size=(height, width))
+        elif kind == 1:
+            # Semi-transparent pixels that fades can push past ALPHA_LIMIT
+            alpha = rng.choice([0, 40, 100, 127, 128, 200, 255], size=(height, width))
+        elif kind == 2:
+            yy, xx = np.indices((height, width))
+            alpha = np.where((xx + yy) % 2 == 0, 255, 0)
+            alpha[rng.random((height, width)) < 0.2] = 255
+        else:
+            alpha = rng.choice([0, 255, 255, 255, 96, 64, 32, 1, 97], size=(height, width))
+
+        pixel_array = rng.integers(0, 256, size=(height, width, 4)).astype(np.uint8)
+        pixel_array[rng.random((height, width)) < 0.2, :3] = 255
+        pixel_array[:, :, 3] = alpha
+        yield pixel_array
+
+    # Rows of shadows that each depend on the one before through its fades,
+    # which settle one link per NumPy pass
+    chain = np.zeros((8, 64, 4), dtype=np.uint8)
+    chain[:, :, :3] = 200
+    chain[::2, :, 3] = np.where(np.arange(64) % 2 == 0, 255, 100)
+    yield chain
+
+
+class ConvertCheckerboardToAlphaTest(unittest.TestCase):
+
+    def assert_matches_reference(self, transparency_color=None, band_rows=None):
+        for pixel_array in random_images():
+            expected = pixel_array.copy()
+            if transparency_color is not None:
+                chess.make_color_transparent(expected, transparency_color)
+            reference_convert(expected)
+
+            # Size TILE_BYTES to give bands of band_rows rows at this width
+            tile_bytes = chess.TILE_BYTES
+            if band_rows is not None:
+                tile_bytes = band_rows * pixel_array.shape[1] * 4
+
+            image = Image.fromarray(pixel_array, 'RGBA')
+            with mock.patch.object(chess, 'TILE_BYTES', tile_bytes):
+                result = np.asarray(convert_checkerboard_to_alpha(image, transparency_color))
+            np.testing.assert_array_equal(result, expected)
+
+    def test_default_path(self):
+        self.assert_matches_reference()
+        self.assert_matches_reference(0xffffff)
+
+    def test_numpy_bands(self):
+        # Bands of 1-3 rows, finished by the sequential scan after 0 or 1
+        # passes, or left to settle
+        for band_rows in (1, 2, 3):
+            for max_passes in (0, 1, chess.MAX_BAND_PASSES):
+                with self.subTest(band_rows=band_rows, max_passes=max_passes), \
+                        mock.patch.object(chess, 'SCAN_IS_COMPILED', False), \
+                        mock.patch.object(chess, 'MAX_BAND_PASSES', max_passes):
+                    self.assert_matches_reference(band_rows=band_rows)
+
+    def test_sample_sprite(self):
+        image = Image.open(HERE / 'd-sw1-03.bmp')
+        expected = np.asarray(Image.open(HERE / 'd-sw1-03.png').convert('RGBA'))
+
+        for compiled in sorted({chess.SCAN_IS_COMPILED, False}):
+            with self.subTest(compiled=compiled), \
+                    mock.patch.object(chess, 'SCAN_IS_COMPILED', compiled):
+                result = np.asarray(convert_checkerboard_to_alpha(image))
+                np.testing.assert_array_equal(result, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()